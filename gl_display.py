@@ -0,0 +1,212 @@
+import ctypes
+from OpenGL import GL
+from OpenGL.GL import shaders
+from pyopengltk import OpenGLFrame
+
+VERTEX_SHADER = """
+#version 120
+void main() {
+    gl_TexCoord[0] = gl_MultiTexCoord0;
+    gl_Position = gl_Vertex;
+}
+"""
+
+# Video-range BT.601 YUV to RGB; anaglyph modes use the Y plane directly
+# as gray for the left eye channel and shifted by the offset for the two
+# right eye channels
+FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D tex_y;
+uniform sampler2D tex_u;
+uniform sampler2D tex_v;
+uniform int mode;
+uniform float shift;
+float gray(vec2 uv) {
+    return (texture2D(tex_y, uv).r - 16.0 / 255.0) * (255.0 / 219.0);
+}
+void main() {
+    vec2 uv = gl_TexCoord[0].st;
+    if (mode == 0) {
+        float y = gray(uv);
+        float u = (texture2D(tex_u, uv).r - 128.0 / 255.0) * (255.0 / 224.0);
+        float v = (texture2D(tex_v, uv).r - 128.0 / 255.0) * (255.0 / 224.0);
+        vec3 color = vec3(y + 1.402 * v, y - 0.344136 * u - 0.714136 * v, y + 1.772 * u);
+        gl_FragColor = vec4(clamp(color, 0.0, 1.0), 1.0);
+        return;
+    }
+    float left = clamp(gray(uv), 0.0, 1.0);
+    float right = uv.s >= shift ? clamp(gray(uv - vec2(shift, 0.0)), 0.0, 1.0) : 0.0;
+    if (mode == 1) {
+        gl_FragColor = vec4(left, right, right, 1.0);
+    } else {
+        gl_FragColor = vec4(right, left, right, 1.0);
+    }
+}
+"""
+
+# Shader mode for each anaglyph display mode; other modes draw plain texture
+SHADER_MODES = {"anaglyph_red_cyan": 1, "anaglyph_green_magenta": 2}
+
+class GLVideoFrame(OpenGLFrame):
+    """
+    A Tk frame that draws yuv420p video frames as OpenGL textures, letting
+    the GPU handle color conversion, scaling, letterboxing and 3D compositing
+    """
+    def __init__(self, *args, on_failure=None, **kw):
+        super().__init__(*args, **kw)
+        self.width = kw.get("width", 1)
+        self.height = kw.get("height", 1)
+
+        # Set when the GL context or shaders can't be created on this system;
+        # on_failure is then called with the error so the caller can fall back
+        self.gl_failed = False
+        self._on_failure = on_failure
+
+        # Texture and shader state
+        self._textures = None
+        self._tex_size = (0, 0)
+        self._has_frame = False
+        self._program = None
+        self._mode = None
+        self._offset = 0
+
+    def tkMap(self, evt):
+        """Create the GL context on first map, reporting failure instead of raising"""
+        if self.gl_failed:
+            return
+        try:
+            super().tkMap(evt)
+        except Exception as e:
+            self.gl_failed = True
+            if self._on_failure is not None:
+                self._on_failure(e)
+
+    def tkResize(self, evt):
+        if self.gl_failed:
+            return
+        super().tkResize(evt)
+
+    def tkExpose(self, evt):
+        if not self.context_created:
+            return
+        super().tkExpose(evt)
+
+    def initgl(self):
+        """Setup GL state (called on map and again on every resize)"""
+        GL.glClearColor(0.0, 0.0, 0.0, 1.0)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        GL.glEnable(GL.GL_TEXTURE_2D)
+
+        if self._textures is None:
+            # One luminance texture per Y, U and V plane
+            self._textures = GL.glGenTextures(3)
+            for texture in self._textures:
+                GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+                GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR)
+                GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
+                GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_CLAMP_TO_EDGE)
+                GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_CLAMP_TO_EDGE)
+
+        if self._program is None:
+            self._program = shaders.compileProgram(
+                shaders.compileShader(VERTEX_SHADER, GL.GL_VERTEX_SHADER),
+                shaders.compileShader(FRAGMENT_SHADER, GL.GL_FRAGMENT_SHADER))
+            self._mode_loc = GL.glGetUniformLocation(self._program, "mode")
+            self._shift_loc = GL.glGetUniformLocation(self._program, "shift")
+            GL.glUseProgram(self._program)
+            for unit, name in enumerate(("tex_y", "tex_u", "tex_v")):
+                GL.glUniform1i(GL.glGetUniformLocation(self._program, name), unit)
+
+    def show_frame(self, planes, mode, offset):
+        """Upload the Y, U and V planes of a frame and draw it in the given 3D mode"""
+        if not self.context_created:
+            return
+        self._mode = mode
+        self._offset = offset
+
+        self.tkMakeCurrent()
+        height, width = planes[0].shape
+
+        # Reallocate texture storage only when the frame size changes
+        realloc = self._tex_size != (width, height)
+        self._tex_size = (width, height)
+        for texture, plane in zip(self._textures, planes):
+            plane_height, plane_width = plane.shape
+            GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+            if realloc:
+                GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_LUMINANCE8, plane_width, plane_height, 0,
+                                GL.GL_LUMINANCE, GL.GL_UNSIGNED_BYTE, None)
+            # Upload straight from the decoder's padded rows
+            GL.glPixelStorei(GL.GL_UNPACK_ROW_LENGTH, plane.strides[0])
+            GL.glTexSubImage2D(GL.GL_TEXTURE_2D, 0, 0, 0, plane_width, plane_height,
+                               GL.GL_LUMINANCE, GL.GL_UNSIGNED_BYTE, ctypes.c_void_p(plane.ctypes.data))
+        GL.glPixelStorei(GL.GL_UNPACK_ROW_LENGTH, 0)
+        self._has_frame = True
+
+        self.redraw()
+        self.tkSwapBuffers()
+
+    def clear(self):
+        """Stop drawing the last frame"""
+        self._has_frame = False
+        if self.context_created:
+            self.tkMakeCurrent()
+            self.redraw()
+            self.tkSwapBuffers()
+
+    def redraw(self):
+        """Draw the current textures fitted to the viewport"""
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+        if not self._has_frame or self.width <= 1 or self.height <= 1:
+            return
+
+        # Fit the frame inside the viewport, preserving aspect ratio
+        tex_width, tex_height = self._tex_size
+        frame_aspect = tex_width / tex_height
+        view_aspect = self.width / self.height
+        if frame_aspect > view_aspect:
+            # Frame is wider, fit to width
+            sx, sy = 1.0, view_aspect / frame_aspect
+        else:
+            # Frame is taller, fit to height
+            sx, sy = frame_aspect / view_aspect, 1.0
+
+        for unit, texture in enumerate(self._textures):
+            GL.glActiveTexture(GL.GL_TEXTURE0 + unit)
+            GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glUseProgram(self._program)
+        offset = min(self._offset, tex_width - 1)
+        shift = offset / tex_width
+
+        if self._mode in SHADER_MODES:
+            # The fragment shader builds the anaglyph from the full frame
+            GL.glUniform1i(self._mode_loc, SHADER_MODES[self._mode])
+            GL.glUniform1f(self._shift_loc, shift)
+            self._draw_quad(-sx, -sy, sx, sy, 0.0, 1.0)
+            return
+
+        GL.glUniform1i(self._mode_loc, 0)
+        if self._mode in ("side_by_side_cross_eye", "side_by_side_parallel"):
+            # Each eye is the frame trimmed by the offset on one side, drawn
+            # into its half with the aspect ratio kept and centered vertically
+            band = sy * (tex_width / 2) / (tex_width - offset)
+            trim_left = (shift, 1.0)
+            trim_right = (0.0, 1.0 - shift)
+            if self._mode == "side_by_side_cross_eye":
+                left_uv, right_uv = trim_left, trim_right
+            else:
+                left_uv, right_uv = trim_right, trim_left
+            self._draw_quad(-sx, -band, 0.0, band, *left_uv)
+            self._draw_quad(0.0, -band, sx, band, *right_uv)
+        else:
+            self._draw_quad(-sx, -sy, sx, sy, 0.0, 1.0)
+
+    def _draw_quad(self, x0, y0, x1, y1, u0, u1):
+        """Draw a textured quad; texture row 0 is the top of the frame"""
+        GL.glBegin(GL.GL_QUADS)
+        GL.glTexCoord2f(u0, 1.0); GL.glVertex2f(x0, y0)
+        GL.glTexCoord2f(u1, 1.0); GL.glVertex2f(x1, y0)
+        GL.glTexCoord2f(u1, 0.0); GL.glVertex2f(x1, y1)
+        GL.glTexCoord2f(u0, 0.0); GL.glVertex2f(x0, y1)
+        GL.glEnd()
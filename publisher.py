@@ -1,14 +1,15 @@
 import asyncio
-import cv2
 import numpy as np
 from aiortc import RTCPeerConnection, RTCSessionDescription, VideoStreamTrack
 from aiortc.contrib.media import MediaPlayer, MediaRecorder
+from aiortc.mediastreams import MediaStreamError
 import av
 import fractions
 import time
 import argparse
 import json
 import logging
+import signal
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,15 +21,24 @@ class SideBySideVideoTrack(VideoStreamTrack):
     def __init__(self, video_path):
         super().__init__()
         self.video_path = video_path
-        self.cap = cv2.VideoCapture(video_path)
-        if not self.cap.isOpened():
-            raise ValueError(f"Could not open video file: {video_path}")
+        try:
+            self.container = av.open(video_path)
+        except av.FFmpegError as e:
+            raise ValueError(f"Could not open video file: {video_path}") from e
+        if not self.container.streams.video:
+            self.container.close()
+            raise ValueError(f"No video stream in file: {video_path}")
+        
+        # Decode sequentially with FFmpeg's multithreaded decoder
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        self._frames = self.container.decode(self.stream)
         
         # Get video properties
-        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
-        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = float(self.stream.average_rate or 30)
+        self.width = self.stream.codec_context.width
+        self.height = self.stream.codec_context.height
+        self.frame_count = self.stream.frames
         
         logger.info(f"Video loaded: {self.width}x{self.height} @ {self.fps}fps, {self.frame_count} frames")
         
@@ -40,43 +50,44 @@ class SideBySideVideoTrack(VideoStreamTrack):
         # Set track properties
         self.kind = "video"
 
-    async def recv(self):
-        if self.start_time is None:
-            self.start_time = time.time()
-        
-        # Calculate current time
-        current_time = time.time() - self.start_time
-        target_frame = int(current_time * self.fps)
+    def _decode_next(self):
+        """Decode the next frame, looping back to the start on EOF"""
+        try:
+            return next(self._frames)
+        except StopIteration:
+            self.container.seek(0)
+            self._frames = self.container.decode(self.stream)
+            return next(self._frames)
+
+    async def _next_timestamp(self):
+        """Wait until the next frame is due and return its 90kHz pts"""
+        if self.readyState != "live":
+            raise MediaStreamError
         
-        # Loop video if needed
-        if target_frame >= self.frame_count:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        if self.start_time is None:
             self.start_time = time.time()
-            target_frame = 0
-        
-        # Set frame position
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
-        
-        # Read frame
-        ret, frame = self.cap.read()
-        if not ret:
-            # If reading fails, restart video
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-            ret, frame = self.cap.read()
-        
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        else:
+            self.frame_index += 1
+            wait = self.start_time + self.frame_index * self.frame_duration - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
         
-        # Create PyAV frame
-        av_frame = av.VideoFrame.from_ndarray(frame_rgb, format="rgb24")
-        av_frame.pts = int(target_frame * self.frame_duration * 90000)  # 90kHz clock
-        av_frame.time_base = fractions.Fraction(1, 90000)
+        return int(self.frame_index * 90000 / self.fps)
+
+    async def recv(self):
+        # Decode the next frame in order, then wait for its slot
+        frame = self._decode_next()
+        pts = await self._next_timestamp()
         
-        return av_frame
+        # Hand the decoded YUV frame straight to the encoder
+        frame.pts = pts  # 90kHz clock
+        frame.time_base = fractions.Fraction(1, 90000)
+
+        return frame
 
     def __del__(self):
-        if hasattr(self, 'cap'):
-            self.cap.release()
+        if hasattr(self, 'container'):
+            self.container.close()
 
 class WebRTCPublisher:
     def __init__(self, video_path, host="0.0.0.0", port=3030):
@@ -86,12 +97,28 @@ class WebRTCPublisher:
         self.pc = None
         self.video_track = None
         self._connection_lock = asyncio.Lock()
+        self._stop = asyncio.Event()
         
     async def _reset_connection(self):
         """Reset the WebRTC connection completely"""
         if self.pc is not None:
+            pc = self.pc
+            closed = asyncio.Event()
+            
+            # Wait for the connection to actually reach "closed"
+            @pc.on("connectionstatechange")
+            def on_closed():
+                if pc.connectionState == "closed":
+                    closed.set()
+            
+            if pc.connectionState == "closed":
+                closed.set()
+            
             try:
-                await self.pc.close()
+                await pc.close()
+                await asyncio.wait_for(closed.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                logger.warning("Timed out waiting for connection to close")
             except Exception as e:
                 logger.warning(f"Error closing connection: {e}")
             finally:
@@ -100,9 +127,6 @@ class WebRTCPublisher:
         if self.video_track is not None:
             self.video_track = None
         
-        # Small delay to ensure cleanup
-        await asyncio.sleep(0.1)
-        
     async def _create_new_connection(self):
         """Create a fresh WebRTC connection"""
         await self._reset_connection()
@@ -239,9 +263,18 @@ class WebRTCPublisher:
         logger.info(f"Publisher running on http://{self.host}:{self.port}")
         await site.start()
         
-        # Keep running
-        while True:
-            await asyncio.sleep(1)
+        # Keep running until SIGINT/SIGTERM (KeyboardInterrupt on Windows)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stop.set)
+            except NotImplementedError:
+                pass
+        await self._stop.wait()
+        
+        logger.info("Shutting down publisher...")
+        await self._reset_connection()
+        await runner.cleanup()
 
 async def main():
     parser = argparse.ArgumentParser(description="3D Video Publisher")
@@ -2,11 +2,14 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import asyncio
 import threading
+import queue
+import base64
 import cv2
 import numpy as np
-from PIL import Image, ImageTk
+import aiohttp
+from numba import njit, prange
 from aiortc import RTCPeerConnection, RTCSessionDescription, VideoStreamTrack
-from aiortc.contrib.media import MediaPlayer, MediaRecorder
+from aiortc.contrib.media import MediaPlayer, MediaRecorder, MediaRelay
 import av
 import fractions
 import time
@@ -15,9 +18,58 @@ import logging
 import websockets
 import ssl
 
+# OpenGL display is optional; fall back to the Tk canvas without it
+try:
+    from gl_display import GLVideoFrame
+except ImportError:
+    GLVideoFrame = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _interpolation(src_width, dst_width):
+    """Area averaging when shrinking, bilinear otherwise"""
+    return cv2.INTER_AREA if dst_width < src_width else cv2.INTER_LINEAR
+
+def _yuv_planes(frame):
+    """Zero-copy (height, width) views of the Y, U and V planes of a yuv420p frame"""
+    return [np.frombuffer(plane, dtype=np.uint8).reshape(plane.height, plane.line_size)[:, :plane.width]
+            for plane in frame.planes]
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _anaglyph_rc(luma, offset, out):
+    """Build a red-cyan anaglyph from the Y plane: gray in red, gray shifted by offset in green/blue"""
+    height, width = luma.shape
+    for y in prange(height):
+        for x in range(min(offset, width)):
+            out[y, x, 1] = 0
+            out[y, x, 2] = 0
+        for x in range(width):
+            # Expand video-range luma (16-235) to full-range gray, rounded:
+            # 298 / 256 ~= 255 / 219 as in the shader, and 235 maps to 255
+            out[y, x, 0] = min(max(((luma[y, x] - 16) * 298 + 128) >> 8, 0), 255)
+        # Shifted copy of the luma just written, no temporary and no branch
+        for x in range(offset, width):
+            out[y, x, 1] = out[y, x - offset, 0]
+            out[y, x, 2] = out[y, x - offset, 0]
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _anaglyph_gm(luma, offset, out):
+    """Build a green-magenta anaglyph from the Y plane: gray in green, gray shifted by offset in red/blue"""
+    height, width = luma.shape
+    for y in prange(height):
+        for x in range(min(offset, width)):
+            out[y, x, 0] = 0
+            out[y, x, 2] = 0
+        for x in range(width):
+            # Expand video-range luma (16-235) to full-range gray, rounded:
+            # 298 / 256 ~= 255 / 219 as in the shader, and 235 maps to 255
+            out[y, x, 1] = min(max(((luma[y, x] - 16) * 298 + 128) >> 8, 0), 255)
+        # Shifted copy of the luma just written, no temporary and no branch
+        for x in range(offset, width):
+            out[y, x, 0] = out[y, x - offset, 1]
+            out[y, x, 2] = out[y, x - offset, 1]
+
 class VideoReceiver:
     def __init__(self, root):
         self.root = root
@@ -28,11 +80,23 @@ class VideoReceiver:
         self.pc = None
         self.video_track = None
         self.remote_video = None
+        self.relay = MediaRelay()
         
         # Video display variables
-        self.current_frame = None
         self.is_playing = False
         
+        # Latest processed frame waiting for the UI thread
+        self._pending_frame = None
+        self._pending_lock = threading.Lock()
+        
+        # Reusable buffers for the CPU display path: an I420 frame for
+        # side-by-side, a scaled Y plane for anaglyph, and the PPM image
+        self._yuv_buf = None
+        self._yuv_views = None
+        self._luma_buf = None
+        self._ppm_buf = None
+        self._ppm_pixels = None
+        
         # Setup UI
         self.setup_ui()
         
@@ -40,6 +104,14 @@ class VideoReceiver:
         self.loop = asyncio.new_event_loop()
         self.thread = threading.Thread(target=self.run_async_loop, daemon=True)
         self.thread.start()
+        
+        # One HTTP session for all signaling requests, bound to the async loop
+        self._http = asyncio.run_coroutine_threadsafe(self._create_http_session(), self.loop).result()
+        
+        # Process frames off the event loop so RTP receiving keeps up
+        self.frame_queue = queue.Queue(maxsize=2)
+        self.frame_thread = threading.Thread(target=self.process_frames, daemon=True)
+        self.frame_thread.start()
     
     def setup_ui(self):
         """Setup the user interface"""
@@ -82,9 +154,16 @@ class VideoReceiver:
         video_frame.columnconfigure(0, weight=1)
         video_frame.rowconfigure(0, weight=1)
         
-        # Video canvas
-        self.video_canvas = tk.Canvas(video_frame, bg="black", width=800, height=600)
-        self.video_canvas.grid(row=0, column=0, sticky="nsew")
+        # Video canvas, drawn with OpenGL when available
+        self.use_gl = GLVideoFrame is not None
+        if self.use_gl:
+            self.video_canvas = GLVideoFrame(video_frame, width=800, height=600,
+                                             on_failure=self._on_gl_failure)
+            self._place_video_canvas()
+        else:
+            self._create_canvas(video_frame)
+        self._canvas_w = 0
+        self._canvas_h = 0
         
         # Controls frame
         controls_frame = ttk.Frame(main_frame)
@@ -97,6 +176,8 @@ class VideoReceiver:
                                  values=["side_by_side_cross_eye", "side_by_side_parallel", "anaglyph_red_cyan", "anaglyph_green_magenta"],
                                  state="readonly", width=20)
         mode_combo.grid(row=0, column=1, sticky=tk.W, padx=(0, 20))
+        mode_combo.bind("<<ComboboxSelected>>", self._on_mode_change)
+        self._mode = self.mode_var.get()
         
         # Offset slider
         ttk.Label(controls_frame, text="Offset:").grid(row=0, column=2, sticky=tk.W, padx=(0, 5))
@@ -104,6 +185,7 @@ class VideoReceiver:
         self.offset_slider = ttk.Scale(controls_frame, from_=10, to=100, variable=self.offset_var, 
                                       orient=tk.HORIZONTAL, length=150, command=self.on_offset_change)
         self.offset_slider.grid(row=0, column=3, sticky=tk.W, padx=(0, 10))
+        self._offset = self.offset_var.get()
         
         # Offset value label
         self.offset_label = ttk.Label(controls_frame, text="20")
@@ -122,11 +204,44 @@ class VideoReceiver:
         self.root.bind('<Escape>', lambda e: self.exit_fullscreen())
         self.root.bind('<F11>', lambda e: self.toggle_fullscreen())
     
+    def _create_canvas(self, parent):
+        """Create the plain Tk canvas display"""
+        self.video_canvas = tk.Canvas(parent, bg="black", width=800, height=600)
+        self._place_video_canvas()
+        
+        # Single reusable photo image shown by a single canvas item
+        self._tk_img = tk.PhotoImage()
+        self._tk_img_size = (0, 0)
+        self._canvas_img_id = self.video_canvas.create_image(0, 0, anchor=tk.NW, image=self._tk_img)
+    
+    def _place_video_canvas(self):
+        """Grid the video display and track its size"""
+        self.video_canvas.grid(row=0, column=0, sticky="nsew")
+        self.video_canvas.bind("<Configure>", self._on_configure, add="+")
+    
+    def _on_gl_failure(self, error):
+        """Fall back to the Tk canvas when OpenGL can't start at runtime"""
+        logger.warning(f"OpenGL display unavailable, using Tk canvas: {error}")
+        
+        # Swap the widgets once the GL frame's <Map> handler has returned
+        self.root.after_idle(self._replace_gl_display)
+    
+    def _replace_gl_display(self):
+        """Replace the failed GL frame with the Tk canvas in the same place"""
+        parent = self.video_canvas.master
+        self.video_canvas.destroy()
+        self._create_canvas(parent)
+        self.use_gl = False
+    
     def run_async_loop(self):
         """Run async event loop in separate thread"""
         asyncio.set_event_loop(self.loop)
         self.loop.run_forever()
     
+    async def _create_http_session(self):
+        """Create the shared HTTP session inside the async loop"""
+        return aiohttp.ClientSession()
+    
     def connect_to_publisher(self):
         """Connect to the publisher"""
         url = self.url_var.get()
@@ -154,8 +269,9 @@ class VideoReceiver:
             async def on_track(track):
                 logger.info(f"Received {track.kind} track")
                 if track.kind == "video":
-                    self.video_track = track
-                    await self.handle_video_track(track)
+                    # Unbuffered relay keeps only the newest frame when we fall behind
+                    self.video_track = self.relay.subscribe(track, buffered=False)
+                    await self.handle_video_track(self.video_track)
             
             # Create offer
             offer = await self.pc.createOffer()
@@ -165,24 +281,22 @@ class VideoReceiver:
             uri = url.replace("ws://", "http://").replace("wss://", "https://")
             offer_url = f"{uri}/offer"
             
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.post(offer_url, json={
-                    "sdp": self.pc.localDescription.sdp,
-                    "type": self.pc.localDescription.type
-                }) as response:
-                    if response.status == 200:
-                        answer_data = await response.json()
-                        answer = RTCSessionDescription(
-                            sdp=answer_data["sdp"],
-                            type=answer_data["type"]
-                        )
-                        await self.pc.setRemoteDescription(answer)
-                        
-                        # Update UI
-                        self.root.after(0, self._update_connection_status, True)
-                    else:
-                        raise Exception(f"Failed to connect: {response.status}")
+            async with self._http.post(offer_url, json={
+                "sdp": self.pc.localDescription.sdp,
+                "type": self.pc.localDescription.type
+            }) as response:
+                if response.status == 200:
+                    answer_data = await response.json()
+                    answer = RTCSessionDescription(
+                        sdp=answer_data["sdp"],
+                        type=answer_data["type"]
+                    )
+                    await self.pc.setRemoteDescription(answer)
+                    
+                    # Update UI
+                    self.root.after(0, self._update_connection_status, True)
+                else:
+                    raise Exception(f"Failed to connect: {response.status}")
                         
         except Exception as e:
             logger.error(f"Connection failed: {e}")
@@ -211,181 +325,240 @@ class VideoReceiver:
             try:
                 frame = await track.recv()
                 
-                # Convert frame to numpy array
-                img = frame.to_ndarray(format="rgb24")
+                # Hand off to the processing thread
+                self._enqueue_frame(frame)
                 
-                # Process frame for 3D display
-                processed_img = self.process_3d_frame(img)
+            except Exception as e:
+                logger.error(f"Error receiving video frame: {e}")
+                break
+        
+        self.is_playing = False
+    
+    def _enqueue_frame(self, frame):
+        """Queue a frame for processing, dropping the oldest one if full"""
+        try:
+            self.frame_queue.put_nowait(frame)
+        except queue.Full:
+            try:
+                self.frame_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.frame_queue.put_nowait(frame)
+    
+    def process_frames(self):
+        """Process received frames in a worker thread"""
+        while True:
+            frame = self.frame_queue.get()
+            if frame is None:
+                break
+            
+            try:
+                # Work on the decoded YUV planes, never materializing full-size RGB
+                if frame.format.name != "yuv420p":
+                    frame = frame.reformat(format="yuv420p")
+                planes = _yuv_planes(frame)
+                
+                # The GL path converts and composites on the GPU
+                if self.use_gl:
+                    self._post_frame(planes)
+                    continue
                 
-                # Update display in UI thread
-                self.root.after(0, self._update_video_display, processed_img)
+                # Process frame for 3D display at the size it will be shown
+                height, width = planes[0].shape
+                size = self._fit_to_canvas(width, height)
+                if size is not None:
+                    self._post_frame(self._prepare_ppm(planes, *size))
                 
             except Exception as e:
                 logger.error(f"Error processing video frame: {e}")
-                break
+    
+    def _fit_to_canvas(self, width, height):
+        """Size that fits a width x height frame in the canvas, or None before layout"""
+        canvas_width = self._canvas_w
+        canvas_height = self._canvas_h
+        if canvas_width <= 1 or canvas_height <= 1:
+            return None
         
-        self.is_playing = False
+        # Calculate aspect ratio
+        frame_aspect = width / height
+        canvas_aspect = canvas_width / canvas_height
+        
+        if frame_aspect > canvas_aspect:
+            # Frame is wider, fit to width
+            new_width = canvas_width
+            new_height = int(canvas_width / frame_aspect)
+        else:
+            # Frame is taller, fit to height
+            new_height = canvas_height
+            new_width = int(canvas_height * frame_aspect)
+        
+        # Keep the chroma planes evenly split between the two halves
+        new_width -= new_width % 4
+        new_height -= new_height % 2
+        if new_width < 4 or new_height < 2:
+            return None
+        return new_width, new_height
     
-    def process_3d_frame(self, frame):
-        """Process frame for 3D display based on selected mode"""
-        height, width = frame.shape[:2]
-        half_width = width // 2
+    def _prepare_ppm(self, planes, width, height):
+        """Render the frame at display size into the PPM buffer and encode it for Tk"""
+        # Reallocate the PPM buffer only on size change
+        if self._ppm_pixels is None or self._ppm_pixels.shape[:2] != (height, width):
+            header = b"P6\n%d %d\n255\n" % (width, height)
+            self._ppm_buf = bytearray(header) + bytearray(width * height * 3)
+            self._ppm_pixels = np.frombuffer(self._ppm_buf, dtype=np.uint8, offset=len(header)).reshape(height, width, 3)
+        
+        # Write RGB straight into the PPM payload
+        self.process_3d_frame(planes, self._ppm_pixels)
         
-        mode = self.mode_var.get()
+        return base64.b64encode(self._ppm_buf), width, height
+    
+    def process_3d_frame(self, planes, out):
+        """Render YUV planes into the RGB out buffer based on selected mode"""
+        mode = self._mode
         
         if mode == "side_by_side_cross_eye":
-            # Create side-by-side cross-eye 3D with offset
-            height, width = frame.shape[:2]
-            
-            # Create output frame with same dimensions
-            side_by_side = np.zeros_like(frame)
-            
-            # Apply offset - trim from different sides for each eye
-            offset = self.offset_var.get()
-            
             # Left half: right eye view (trimmed from left side)
-            left_half = frame[:, offset:, :]  # Trim from left
-            # Calculate new height to maintain aspect ratio
-            new_height = int((width//2) * height / (width - offset))
-            # Resize to fit left half while maintaining aspect ratio
-            left_half_resized = cv2.resize(left_half, (width//2, new_height))
-            # Center the resized video in the left half
-            y_offset = (height - new_height) // 2
-            side_by_side[y_offset:y_offset+new_height, :width//2] = left_half_resized
-            
             # Right half: left eye view (trimmed from right side)
-            right_half = frame[:, :-offset, :]  # Trim from right
-            # Calculate new height to maintain aspect ratio
-            new_height = int((width//2) * height / (width - offset))
-            # Resize to fit right half while maintaining aspect ratio
-            right_half_resized = cv2.resize(right_half, (width//2, new_height))
-            # Center the resized video in the right half
-            y_offset = (height - new_height) // 2
-            side_by_side[y_offset:y_offset+new_height, width//2:] = right_half_resized
-            
-            return side_by_side
+            self._compose_side_by_side(planes, self._offset, True, out)
         
         elif mode == "side_by_side_parallel":
-            # Create side-by-side parallel 3D with offset
-            height, width = frame.shape[:2]
-            
-            # Create output frame with same dimensions
-            side_by_side = np.zeros_like(frame)
-            
-            # Apply offset - trim from different sides for each eye
-            offset = self.offset_var.get()
-            
             # Left half: left eye view (trimmed from right side)
-            left_half = frame[:, :-offset, :]  # Trim from right
-            # Calculate new height to maintain aspect ratio
-            new_height = int((width//2) * height / (width - offset))
-            # Resize to fit left half while maintaining aspect ratio
-            left_half_resized = cv2.resize(left_half, (width//2, new_height))
-            # Center the resized video in the left half
-            y_offset = (height - new_height) // 2
-            side_by_side[y_offset:y_offset+new_height, :width//2] = left_half_resized
-            
             # Right half: right eye view (trimmed from left side)
-            right_half = frame[:, offset:, :]  # Trim from left
-            # Calculate new height to maintain aspect ratio
-            new_height = int((width//2) * height / (width - offset))
-            # Resize to fit right half while maintaining aspect ratio
-            right_half_resized = cv2.resize(right_half, (width//2, new_height))
-            # Center the resized video in the right half
-            y_offset = (height - new_height) // 2
-            side_by_side[y_offset:y_offset+new_height, width//2:] = right_half_resized
-            
-            return side_by_side
+            self._compose_side_by_side(planes, self._offset, False, out)
         
-        elif mode == "anaglyph_red_cyan":
-            # Create red-cyan anaglyph with proper offset
-            # Use the full frame and create offset between left and right eye views
-            height, width = frame.shape[:2]
-            
-            # Create anaglyph with the same dimensions as original
-            anaglyph = np.zeros((height, width, 3), dtype=np.uint8)
-            
-            # Convert to grayscale
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        elif mode in ("anaglyph_red_cyan", "anaglyph_green_magenta"):
+            # The Y plane is the grayscale image
+            luma = planes[0]
+            height, width = luma.shape
+            out_height, out_width = out.shape[:2]
             
             # Apply offset - shift the right eye view slightly to the right
-            offset = self.offset_var.get()
-            
-            # Red channel (left eye) - use original position
-            anaglyph[:, :, 0] = gray_frame
+            offset = self._offset
             
-            # Green and Blue channels (right eye) - apply offset
-            # Shift the right eye view to create depth
-            right_shifted = np.zeros_like(gray_frame)
-            right_shifted[:, offset:] = gray_frame[:, :-offset] if offset > 0 else gray_frame
-            anaglyph[:, :, 1] = right_shifted  # Green channel
-            anaglyph[:, :, 2] = right_shifted  # Blue channel
+            # Scale luma to the output size first so the kernel runs on fewer pixels
+            if (out_height, out_width) != (height, width):
+                if self._luma_buf is None or self._luma_buf.shape != (out_height, out_width):
+                    self._luma_buf = np.empty((out_height, out_width), dtype=np.uint8)
+                cv2.resize(luma, (out_width, out_height), dst=self._luma_buf,
+                           interpolation=_interpolation(width, out_width))
+                luma = self._luma_buf
+                offset = round(offset * out_width / width)
             
-            return anaglyph
+            # Gray, shift and channel packing in a single pass
+            if mode == "anaglyph_red_cyan":
+                _anaglyph_rc(luma, offset, out)
+            else:
+                _anaglyph_gm(luma, offset, out)
         
-        elif mode == "anaglyph_green_magenta":
-            # Create green-magenta anaglyph with proper offset
-            height, width = frame.shape[:2]
-            
-            # Create anaglyph with the same dimensions as original
-            anaglyph = np.zeros((height, width, 3), dtype=np.uint8)
-            
-            # Convert to grayscale
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-            
-            # Apply offset - shift the right eye view slightly to the right
-            offset = self.offset_var.get()
+        else:
+            # Plain frame, scaled
+            for plane, dst in zip(planes, self._get_yuv_views(out)):
+                cv2.resize(plane, (dst.shape[1], dst.shape[0]), dst=dst,
+                           interpolation=_interpolation(plane.shape[1], dst.shape[1]))
+            cv2.cvtColor(self._yuv_buf, cv2.COLOR_YUV2RGB_I420, dst=out)
+        
+        return out
+    
+    def _get_yuv_views(self, out):
+        """Y, U and V views into the reusable I420 buffer matching out's size"""
+        height, width = out.shape[:2]
+        shape = (height * 3 // 2, width)
+        if self._yuv_buf is None or self._yuv_buf.shape != shape:
+            self._yuv_buf = np.empty(shape, dtype=np.uint8)
+            flat = self._yuv_buf.reshape(-1)
+            y_size = width * height
+            c_size = y_size // 4
+            self._yuv_views = [
+                flat[:y_size].reshape(height, width),
+                flat[y_size:y_size+c_size].reshape(height // 2, width // 2),
+                flat[y_size+c_size:].reshape(height // 2, width // 2),
+            ]
+        return self._yuv_views
+    
+    def _compose_side_by_side(self, planes, offset, cross_eye, out):
+        """Resize both eye views of each plane into the I420 buffer, then convert once"""
+        width = planes[0].shape[1]
+        out_height = out.shape[0]
+        
+        # Calculate new height to maintain aspect ratio, even for the chroma planes
+        new_height = 2 * round(out_height * (width / 2) / (width - offset) / 2)
+        # Center the resized video vertically
+        y_offset = ((out_height - new_height) // 2) & ~1
+        
+        for index, (plane, dst) in enumerate(zip(planes, self._get_yuv_views(out))):
+            # Chroma planes are subsampled by two in both directions
+            sub = 1 if index == 0 else 2
+            plane_offset = offset // sub
+            band_top = y_offset // sub
+            band_height = new_height // sub
+            half_width = dst.shape[1] // 2
             
-            # Green channel (left eye) - use original position
-            anaglyph[:, :, 1] = gray_frame
+            # Apply offset - trim from different sides for each eye
+            trimmed_left = plane[:, plane_offset:]
+            trimmed_right = plane[:, :plane.shape[1] - plane_offset]
+            if cross_eye:
+                left_view, right_view = trimmed_left, trimmed_right
+            else:
+                left_view, right_view = trimmed_right, trimmed_left
             
-            # Red and Blue channels (right eye) - apply offset
-            right_shifted = np.zeros_like(gray_frame)
-            right_shifted[:, offset:] = gray_frame[:, :-offset] if offset > 0 else gray_frame
-            anaglyph[:, :, 0] = right_shifted  # Red channel
-            anaglyph[:, :, 2] = right_shifted  # Blue channel
+            # Fill only the letterbox bands with black
+            black = 16 if index == 0 else 128
+            dst[:band_top] = black
+            dst[band_top+band_height:] = black
             
-            return anaglyph
+            # Resize each eye straight into its band of the output
+            interp = _interpolation(left_view.shape[1], half_width)
+            cv2.resize(left_view, (half_width, band_height),
+                       dst=dst[band_top:band_top+band_height, :half_width],
+                       interpolation=interp)
+            cv2.resize(right_view, (dst.shape[1] - half_width, band_height),
+                       dst=dst[band_top:band_top+band_height, half_width:],
+                       interpolation=interp)
         
-        return frame
+        # Single YUV to RGB conversion, at display resolution
+        cv2.cvtColor(self._yuv_buf, cv2.COLOR_YUV2RGB_I420, dst=out)
+        return out
     
-    def _update_video_display(self, frame):
+    def _post_frame(self, frame):
+        """Hand a frame to the UI thread, replacing any frame not yet shown"""
+        with self._pending_lock:
+            scheduled = self._pending_frame is not None
+            self._pending_frame = frame
+        
+        if not scheduled:
+            self.root.after(0, self._update_video_display)
+    
+    def _update_video_display(self):
         """Update video display in UI thread"""
+        with self._pending_lock:
+            frame, self._pending_frame = self._pending_frame, None
+        if frame is None:
+            return
+        
         try:
-            # Convert numpy array to PIL Image
-            height, width = frame.shape[:2]
+            if self.use_gl:
+                # The GPU converts, composites, scales and letterboxes the planes
+                self.video_canvas.show_frame(frame, self._mode, self._offset)
+                return
+            if isinstance(frame, list):
+                # Planes posted for the GL display before it fell back
+                return
             
-            # Resize frame to fit canvas
-            canvas_width = self.video_canvas.winfo_width()
-            canvas_height = self.video_canvas.winfo_height()
+            ppm_data, new_width, new_height = frame
+            
+            # Resize the photo image only on size change
+            if self._tk_img_size != (new_width, new_height):
+                self._tk_img.configure(width=new_width, height=new_height)
+                self._tk_img_size = (new_width, new_height)
+            
+            # Load the pixels into the reusable photo image as PPM data
+            self._tk_img.configure(data=ppm_data)
+            
+            # Update the persistent canvas image in place
+            x = (self._canvas_w - new_width) // 2
+            y = (self._canvas_h - new_height) // 2
+            self.video_canvas.coords(self._canvas_img_id, x, y)
             
-            if canvas_width > 1 and canvas_height > 1:
-                # Calculate aspect ratio
-                frame_aspect = width / height
-                canvas_aspect = canvas_width / canvas_height
-                
-                if frame_aspect > canvas_aspect:
-                    # Frame is wider, fit to width
-                    new_width = canvas_width
-                    new_height = int(canvas_width / frame_aspect)
-                else:
-                    # Frame is taller, fit to height
-                    new_height = canvas_height
-                    new_width = int(canvas_height * frame_aspect)
-                
-                # Resize frame
-                frame_resized = cv2.resize(frame, (new_width, new_height))
-                
-                # Convert to PIL Image
-                pil_image = Image.fromarray(frame_resized)
-                self.current_frame = ImageTk.PhotoImage(pil_image)
-                
-                # Update canvas
-                self.video_canvas.delete("all")
-                x = (canvas_width - new_width) // 2
-                y = (canvas_height - new_height) // 2
-                self.video_canvas.create_image(x, y, anchor=tk.NW, image=self.current_frame)
-                
         except Exception as e:
             logger.error(f"Error updating video display: {e}")
     
@@ -404,13 +577,27 @@ class VideoReceiver:
         self.info_var.set("Ready to connect")
         
         # Clear video display
-        self.video_canvas.delete("all")
-        self.current_frame = None
+        with self._pending_lock:
+            self._pending_frame = None
+        if self.use_gl:
+            self.video_canvas.clear()
+        else:
+            self._tk_img.blank()
     
     def on_offset_change(self, value):
         """Handle offset slider change"""
         offset_value = int(float(value))
         self.offset_label.config(text=str(offset_value))
+        self._offset = offset_value
+    
+    def _on_mode_change(self, event):
+        """Handle 3D mode selection"""
+        self._mode = self.mode_var.get()
+    
+    def _on_configure(self, event):
+        """Track canvas size for the display path"""
+        self._canvas_w = event.width
+        self._canvas_h = event.height
     
     def toggle_fullscreen(self):
         """Toggle fullscreen mode"""
@@ -423,6 +610,11 @@ class VideoReceiver:
     def on_closing(self):
         """Handle window closing"""
         self.disconnect()
+        self._enqueue_frame(None)
+        try:
+            asyncio.run_coroutine_threadsafe(self._http.close(), self.loop).result(timeout=1.0)
+        except Exception as e:
+            logger.warning(f"Error closing HTTP session: {e}")
         self.loop.call_soon_threadsafe(self.loop.stop)
         self.root.destroy()
 